@@ -3,20 +3,142 @@ Batch processing endpoints
 """
 import asyncio
 from typing import List, Literal
-from fastapi import APIRouter, UploadFile, File, HTTPException, Form
-from datetime import datetime
+from fastapi import APIRouter, BackgroundTasks, Request, UploadFile, File, HTTPException, Form
+from fastapi.responses import ORJSONResponse
 import time
 
 from app.core.config import settings
-from app.models.response import BatchExtractionResponse, ExtractionResponse
+from app.utils.timestamps import now_iso
+from app.models.response import (
+    BATCH_RESPONSE_ADAPTER,
+    BatchExtractionResponse,
+    ExtractionResponse
+)
 from app.services.extractor import extractor
-from app.api.endpoints.extract import save_upload_file, cleanup_file
+from app.api.endpoints.extract import (
+    save_upload_file,
+    cleanup_file,
+    reject_oversized_request
+)
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+
+def _error_result(document_type: str, filename: str, error: str, timestamp: str) -> dict:
+    """Build an error result dictionary for a single failed document"""
+    return {
+        "status": "error",
+        "document_type": document_type,
+        "data": None,
+        "metadata": {
+            "processed_at": timestamp,
+            "original_filename": filename
+        },
+        "error": error
+    }
+
+
+async def _run_batch_pipeline(
+    files: List[UploadFile],
+    document_type: str,
+    file_paths: list
+) -> tuple:
+    """
+    Save uploads and extract them through a bounded producer/consumer pipeline
+
+    A producer coroutine streams each upload to disk and feeds it into a
+    queue while N consumer coroutines pop and extract, so extractions start
+    as soon as the first file is saved instead of after the whole batch.
+
+    Args:
+        files: Uploaded files to process
+        document_type: Type of documents ("pan" or "aadhaar")
+        file_paths: List the caller owns; saved (path, filename) pairs are
+            appended so the caller can clean them up
+
+    Returns:
+        Tuple of (per-document result dictionaries, successful count)
+    """
+    concurrency = settings.BATCH_CONCURRENCY
+    queue: asyncio.Queue = asyncio.Queue(maxsize=2 * concurrency)
+    # Preallocated so each document's result lands at its input position
+    # regardless of completion order
+    results: list = [None] * len(files)
+    successful = 0
+
+    # One timestamp for every error record in this batch; building it is a
+    # syscall plus formatting and doesn't need to be repeated per failure
+    batch_ts = now_iso()
+
+    async def producer():
+        for index, file in enumerate(files):
+            try:
+                file_path, content_hash = await save_upload_file(file)
+            except Exception as e:
+                results[index] = _error_result(
+                    document_type, file.filename, f"Error saving file: {str(e)}", batch_ts
+                )
+                continue
+            file_paths.append((file_path, file.filename))
+            await queue.put((index, file_path, file.filename, content_hash))
+        # One sentinel per consumer so they all shut down
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def consumer():
+        nonlocal successful
+        while (item := await queue.get()) is not None:
+            index, file_path, filename, content_hash = item
+
+            try:
+                # Duplicate documents within or across batches hit the
+                # extractor's inference cache via the content hash
+                result = await extractor.extract_from_image(
+                    file_path,
+                    document_type=document_type,
+                    original_filename=filename,
+                    content_hash=content_hash
+                )
+                if result.get("status") == "success":
+                    successful += 1
+                results[index] = result
+            except Exception as e:
+                results[index] = _error_result(document_type, filename, str(e), batch_ts)
+
+    await asyncio.gather(producer(), *[consumer() for _ in range(concurrency)])
+    return results, successful
+
+
+def _build_batch_response(results: list, successful: int, start_time: float) -> ORJSONResponse:
+    """Assemble and serialize the batch response through the cached adapter"""
+    failed = len(results) - successful
+    processing_time = (time.perf_counter() - start_time) * 1000
+
+    # Determine overall status
+    if successful == len(results):
+        overall_status = "success"
+    elif successful > 0:
+        overall_status = "partial"
+    else:
+        overall_status = "error"
+
+    batch = BatchExtractionResponse(
+        status=overall_status,
+        total_documents=len(results),
+        successful=successful,
+        failed=failed,
+        results=results,
+        processing_time_ms=round(processing_time, 2)
+    )
+
+    # Returning a response directly skips FastAPI's re-validation of the model
+    return ORJSONResponse(content=BATCH_RESPONSE_ADAPTER.dump_python(batch, mode="json"))
 
 
 @router.post("/extract", response_model=BatchExtractionResponse)
 async def batch_extract(
+    request: Request,
+    background: BackgroundTasks,
     files: List[UploadFile] = File(..., description="Multiple document images"),
     document_type: Literal["pan", "aadhaar"] = Form(..., description="Type of documents")
 ):
@@ -28,6 +150,9 @@ async def batch_extract(
     
     Returns batch processing results with individual extraction results
     """
+    # Refuse bodies that are already declared too large for a full batch
+    reject_oversized_request(request, settings.MAX_FILE_SIZE * 50)
+
     if not files:
         raise HTTPException(status_code=400, detail="No files provided")
     
@@ -37,79 +162,25 @@ async def batch_extract(
             detail="Too many files. Maximum 50 files per batch"
         )
     
-    start_time = time.time()
+    start_time = time.perf_counter()
     results = []
     file_paths = []
     
     try:
-        # Save all uploaded files
-        for file in files:
-            try:
-                file_path = await save_upload_file(file)
-                file_paths.append((file_path, file.filename))
-            except Exception as e:
-                results.append({
-                    "status": "error",
-                    "document_type": document_type,
-                    "data": None,
-                    "metadata": {
-                        "processed_at": datetime.now().isoformat(),
-                        "original_filename": file.filename
-                    },
-                    "error": f"Error saving file: {str(e)}"
-                })
-        
-        # Process all files
-        for file_path, filename in file_paths:
-            try:
-                result = await extractor.extract_from_image(
-                    file_path,
-                    document_type=document_type,
-                    original_filename=filename
-                )
-                results.append(result)
-            except Exception as e:
-                results.append({
-                    "status": "error",
-                    "document_type": document_type,
-                    "data": None,
-                    "metadata": {
-                        "processed_at": datetime.now().isoformat(),
-                        "original_filename": filename
-                    },
-                    "error": str(e)
-                })
-        
-        # Calculate statistics
-        successful = sum(1 for r in results if r["status"] == "success")
-        failed = len(results) - successful
-        processing_time = (time.time() - start_time) * 1000
-        
-        # Determine overall status
-        if successful == len(results):
-            overall_status = "success"
-        elif successful > 0:
-            overall_status = "partial"
-        else:
-            overall_status = "error"
-        
-        return BatchExtractionResponse(
-            status=overall_status,
-            total_documents=len(results),
-            successful=successful,
-            failed=failed,
-            results=results,
-            processing_time_ms=round(processing_time, 2)
-        )
-    
+        # Save and extract through the bounded pipeline
+        results, successful = await _run_batch_pipeline(files, document_type, file_paths)
+        return _build_batch_response(results, successful, start_time)
+
     finally:
-        # Cleanup uploaded files
+        # Cleanup runs after the response has been sent
         for file_path, _ in file_paths:
-            cleanup_file(file_path)
+            background.add_task(cleanup_file, file_path)
 
 
 @router.post("/extract/async", response_model=BatchExtractionResponse)
 async def batch_extract_async(
+    request: Request,
+    background: BackgroundTasks,
     files: List[UploadFile] = File(..., description="Multiple document images"),
     document_type: Literal["pan", "aadhaar"] = Form(..., description="Type of documents")
 ):
@@ -122,6 +193,9 @@ async def batch_extract_async(
     Returns batch processing results with individual extraction results.
     This endpoint processes documents in parallel for faster processing.
     """
+    # Refuse bodies that are already declared too large for a full batch
+    reject_oversized_request(request, settings.MAX_FILE_SIZE * 50)
+
     if not files:
         raise HTTPException(status_code=400, detail="No files provided")
     
@@ -131,93 +205,17 @@ async def batch_extract_async(
             detail="Too many files. Maximum 50 files per batch"
         )
     
-    start_time = time.time()
+    start_time = time.perf_counter()
+    results = []
     file_paths = []
-    
+
     try:
-        # Save all uploaded files
-        save_tasks = []
-        for file in files:
-            save_tasks.append(save_upload_file(file))
-        
-        # Save files concurrently
-        saved_paths = []
-        for i, task in enumerate(asyncio.as_completed(save_tasks)):
-            try:
-                file_path = await task
-                saved_paths.append((file_path, files[i].filename))
-                file_paths.append((file_path, files[i].filename))
-            except Exception as e:
-                saved_paths.append((None, files[i].filename, str(e)))
-        
-        # Process all files concurrently
-        extraction_tasks = []
-        for file_path, filename in file_paths:
-            extraction_tasks.append(
-                extractor.extract_from_image(
-                    file_path,
-                    document_type=document_type,
-                    original_filename=filename
-                )
-            )
-        
-        # Wait for all extractions to complete
-        results = []
-        for i, task in enumerate(asyncio.as_completed(extraction_tasks)):
-            try:
-                result = await task
-                results.append(result)
-            except Exception as e:
-                results.append({
-                    "status": "error",
-                    "document_type": document_type,
-                    "data": None,
-                    "metadata": {
-                        "processed_at": datetime.now().isoformat(),
-                        "original_filename": file_paths[i][1] if i < len(file_paths) else "unknown"
-                    },
-                    "error": str(e)
-                })
-        
-        # Add errors from file saving
-        for item in saved_paths:
-            if len(item) == 3:  # Error case
-                _, filename, error = item
-                results.append({
-                    "status": "error",
-                    "document_type": document_type,
-                    "data": None,
-                    "metadata": {
-                        "processed_at": datetime.now().isoformat(),
-                        "original_filename": filename
-                    },
-                    "error": error
-                })
-        
-        # Calculate statistics
-        successful = sum(1 for r in results if r["status"] == "success")
-        failed = len(results) - successful
-        processing_time = (time.time() - start_time) * 1000
-        
-        # Determine overall status
-        if successful == len(results):
-            overall_status = "success"
-        elif successful > 0:
-            overall_status = "partial"
-        else:
-            overall_status = "error"
-        
-        return BatchExtractionResponse(
-            status=overall_status,
-            total_documents=len(results),
-            successful=successful,
-            failed=failed,
-            results=results,
-            processing_time_ms=round(processing_time, 2)
-        )
-    
+        # Save and extract through the bounded pipeline
+        results, successful = await _run_batch_pipeline(files, document_type, file_paths)
+        return _build_batch_response(results, successful, start_time)
+
     finally:
-        # Cleanup uploaded files
+        # Cleanup runs after the response has been sent
         for file_path, _ in file_paths:
-            cleanup_file(file_path)
+            background.add_task(cleanup_file, file_path)
 
@@ -1,92 +1,308 @@
 """
 Document extraction endpoints
 """
+import asyncio
+import hashlib
 import os
-import uuid
+import secrets
+import sys
+import aiofiles
+import aiofiles.os
 from pathlib import Path
-from typing import Literal
-from fastapi import APIRouter, UploadFile, File, HTTPException, Form
-from fastapi.responses import JSONResponse
+from tempfile import SpooledTemporaryFile
+from typing import Literal, Optional, Tuple
+from fastapi import APIRouter, BackgroundTasks, Request, UploadFile, File, HTTPException, Form
+from fastapi.responses import ORJSONResponse
 
 from app.core.config import settings
 from app.models.response import ExtractionResponse, ErrorResponse
 from app.services.extractor import extractor
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Chunk size for streaming uploads to disk (1MB)
+CHUNK_SIZE = 1 << 20
+
+# Slack allowed on top of the file size limit for multipart boundaries and
+# part headers when checking Content-Length
+MULTIPART_OVERHEAD = 4096
+
+def reject_oversized_request(request: Request, max_bytes: int):
+    """
+    Reject a request whose declared body size already exceeds the limit
+
+    Checking Content-Length up front returns a 413 before any body bytes are
+    read, instead of buffering the upload and discovering the overflow later.
+    Chunked uploads without Content-Length are still capped mid-stream by the
+    chunk counter in save_upload_file.
+
+    Args:
+        request: Incoming request
+        max_bytes: Maximum allowed payload size in bytes
+    """
+    content_length = request.headers.get("content-length")
+    if not content_length:
+        return
+
+    try:
+        declared = int(content_length)
+    except ValueError:
+        return
+
+    if declared > max_bytes + MULTIPART_OVERHEAD:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Request body too large. Maximum file size: {settings.MAX_FILE_SIZE} bytes"
+        )
 
 
 def allowed_file(filename: str) -> bool:
     """Check if file extension is allowed"""
-    allowed_extensions = settings.get_allowed_extensions()
     return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in allowed_extensions
+           filename.rpartition('.')[2].lower() in settings.get_allowed_extensions()
+
+
+def _sendfile_copy(src_fd: int, dst_path: str, size: int):
+    """Copy a file descriptor to dst_path entirely in kernel space"""
+    with open(dst_path, "wb") as dst:
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(dst.fileno(), src_fd, offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+
+
+async def _save_rolled_spool(upload_file: UploadFile, file_path: Path) -> Tuple[str, str]:
+    """
+    Persist an upload whose spool has already rolled to an on-disk temp file
 
+    os.sendfile copies the spool to the destination without shuffling the
+    bytes through userland; only the hash pass touches the (page-cached)
+    content.
 
-async def save_upload_file(upload_file: UploadFile) -> str:
+    Args:
+        upload_file: FastAPI UploadFile backed by a rolled spool
+        file_path: Destination path in the upload folder
+
+    Returns:
+        Tuple of (path to saved file, content hash hex digest)
+    """
+    spool = upload_file.file
+    spool.seek(0, os.SEEK_END)
+    total_size = spool.tell()
+    spool.seek(0)
+
+    # Check file size
+    if total_size > settings.MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File too large. Maximum size: {settings.MAX_FILE_SIZE} bytes"
+        )
+
+    # Hash the content for the extraction cache
+    hasher = hashlib.blake2b()
+    while chunk := await upload_file.read(CHUNK_SIZE):
+        hasher.update(chunk)
+    await upload_file.seek(0)
+
+    await asyncio.to_thread(_sendfile_copy, spool.fileno(), str(file_path), total_size)
+    return str(file_path), hasher.hexdigest()
+
+
+async def save_upload_file(upload_file: UploadFile) -> Tuple[str, str]:
     """
     Save uploaded file to temporary location
-    
+
     Args:
         upload_file: FastAPI UploadFile object
-    
+
     Returns:
-        Path to saved file
+        Tuple of (path to saved file, content hash hex digest)
     """
     # Validate file
     if not upload_file.filename:
         raise HTTPException(status_code=400, detail="No filename provided")
-    
+
     if not allowed_file(upload_file.filename):
         raise HTTPException(
             status_code=400,
-            detail=f"File type not allowed. Allowed types: {settings.get_allowed_extensions()}"
+            detail=f"File type not allowed. Allowed types: {sorted(settings.get_allowed_extensions())}"
         )
-    
+
     # Generate unique filename
     file_extension = Path(upload_file.filename).suffix
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
+    unique_filename = f"{secrets.token_hex(8)}{file_extension}"
     file_path = Path(settings.UPLOAD_FOLDER) / unique_filename
-    
-    # Save file
+
     try:
-        contents = await upload_file.read()
-        
-        # Check file size
-        if len(contents) > settings.MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File too large. Maximum size: {settings.MAX_FILE_SIZE} bytes"
-            )
-        
-        with open(file_path, "wb") as f:
-            f.write(contents)
-        
-        return str(file_path)
-    
+        # When the spool has rolled to disk, copy it in kernel space instead
+        # of streaming the bytes through userland. Linux only: on macOS/BSD
+        # os.sendfile exists but requires a socket destination and fails
+        # with ENOTSOCK for a regular file
+        spool = upload_file.file
+        if (
+            sys.platform == "linux"
+            and hasattr(os, "sendfile")
+            and isinstance(spool, SpooledTemporaryFile)
+            and getattr(spool, "_rolled", False)
+        ):
+            return await _save_rolled_spool(upload_file, file_path)
+
+        # Stream file to disk in chunks to avoid holding the whole upload in
+        # memory, hashing the content along the way for the extraction cache
+        total_size = 0
+        hasher = hashlib.blake2b()
+        async with aiofiles.open(file_path, "wb") as f:
+            while chunk := await upload_file.read(CHUNK_SIZE):
+                total_size += len(chunk)
+
+                # Check file size
+                if total_size > settings.MAX_FILE_SIZE:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"File too large. Maximum size: {settings.MAX_FILE_SIZE} bytes"
+                    )
+
+                hasher.update(chunk)
+                await f.write(chunk)
+
+        return str(file_path), hasher.hexdigest()
+
+    except HTTPException:
+        if file_path.exists():
+            file_path.unlink()
+        raise
     except Exception as e:
         if file_path.exists():
             file_path.unlink()
         raise HTTPException(status_code=500, detail=f"Error saving file: {str(e)}")
 
 
-def cleanup_file(file_path: str):
+async def prepare_upload_source(upload_file: UploadFile):
+    """
+    Prepare an upload for extraction, skipping the upload-folder write when possible
+
+    Starlette already spools uploads to a temporary file, so when uploads are
+    not being persisted (DELETE_UPLOADED_FILES=True) the spool can be handed
+    straight to the extractor instead of being written to disk a second time.
+
+    Args:
+        upload_file: FastAPI UploadFile object
+
+    Returns:
+        Tuple of (image_source, saved_path, content_hash) where saved_path
+        is None when no upload-folder copy was written
+    """
+    if not settings.DELETE_UPLOADED_FILES:
+        # Uploads are persisted, so the upload-folder copy is still needed
+        file_path, content_hash = await save_upload_file(upload_file)
+        return file_path, file_path, content_hash
+
+    # Validate file
+    if not upload_file.filename:
+        raise HTTPException(status_code=400, detail="No filename provided")
+
+    if not allowed_file(upload_file.filename):
+        raise HTTPException(
+            status_code=400,
+            detail=f"File type not allowed. Allowed types: {sorted(settings.get_allowed_extensions())}"
+        )
+
+    # Check file size using the spool instead of reading the contents
+    await upload_file.seek(0)
+    upload_file.file.seek(0, os.SEEK_END)
+    total_size = upload_file.file.tell()
+    upload_file.file.seek(0)
+
+    if total_size > settings.MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File too large. Maximum size: {settings.MAX_FILE_SIZE} bytes"
+        )
+
+    # Hash the spooled content for the extraction cache
+    hasher = hashlib.blake2b()
+    while chunk := await upload_file.read(CHUNK_SIZE):
+        hasher.update(chunk)
+    await upload_file.seek(0)
+
+    return upload_file.file, None, hasher.hexdigest()
+
+
+async def cleanup_file(file_path: str):
     """Delete uploaded file if configured"""
     if settings.DELETE_UPLOADED_FILES:
         try:
-            Path(file_path).unlink(missing_ok=True)
+            await aiofiles.os.remove(file_path)
+        except FileNotFoundError:
+            pass
         except Exception as e:
             print(f"Error deleting file {file_path}: {e}")
 
 
+async def _do_extract(
+    request: Request,
+    file: UploadFile,
+    document_type: str,
+    background: BackgroundTasks
+) -> ORJSONResponse:
+    """
+    Shared hot path for the single-document extraction endpoints
+
+    Args:
+        request: Incoming request, used for the Content-Length pre-check
+        file: Uploaded document image
+        document_type: Type of document ("pan" or "aadhaar")
+        background: Task queue that deletes the saved file after the
+            response has been sent
+
+    Returns:
+        Serialized extraction result
+    """
+    # Refuse bodies that are already declared too large
+    reject_oversized_request(request, settings.MAX_FILE_SIZE)
+
+    file_path = None
+
+    try:
+        # Save or spool the uploaded file
+        image_source, file_path, content_hash = await prepare_upload_source(file)
+
+        # Extract information; the extractor's inference cache short-circuits
+        # repeat uploads via the content hash
+        result = await extractor.extract_from_image(
+            image_source,
+            document_type=document_type,
+            original_filename=file.filename,
+            content_hash=content_hash
+        )
+
+        # Returning a response directly skips FastAPI's re-validation of the
+        # already well-formed result dictionary
+        return ORJSONResponse(content=result)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if file_path:
+            # Deletion happens after the response is flushed
+            background.add_task(cleanup_file, file_path)
+
+
 @router.post("/pan", response_model=ExtractionResponse)
 async def extract_pan(
+    request: Request,
+    background: BackgroundTasks,
     file: UploadFile = File(..., description="PAN card image file")
 ):
     """
     Extract details from PAN card
-    
+
     - **file**: PAN card image (JPG, JPEG, PNG, PDF)
-    
+
     Returns extracted PAN card details including:
     - PAN Number
     - Name
@@ -94,32 +310,13 @@ async def extract_pan(
     - Date of Birth
     - Signature Present
     """
-    file_path = None
-    
-    try:
-        # Save uploaded file
-        file_path = await save_upload_file(file)
-        
-        # Extract information
-        result = await extractor.extract_from_image(
-            file_path,
-            document_type="pan",
-            original_filename=file.filename
-        )
-        
-        return result
-    
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if file_path:
-            cleanup_file(file_path)
+    return await _do_extract(request, file, "pan", background)
 
 
 @router.post("/aadhaar", response_model=ExtractionResponse)
 async def extract_aadhaar(
+    request: Request,
+    background: BackgroundTasks,
     file: UploadFile = File(..., description="Aadhaar card image file")
 ):
     """
@@ -135,32 +332,13 @@ async def extract_aadhaar(
     - Address
     - QR Code Present
     """
-    file_path = None
-    
-    try:
-        # Save uploaded file
-        file_path = await save_upload_file(file)
-        
-        # Extract information
-        result = await extractor.extract_from_image(
-            file_path,
-            document_type="aadhaar",
-            original_filename=file.filename
-        )
-        
-        return result
-    
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if file_path:
-            cleanup_file(file_path)
+    return await _do_extract(request, file, "aadhaar", background)
 
 
 @router.post("/", response_model=ExtractionResponse)
 async def extract_document(
+    request: Request,
+    background: BackgroundTasks,
     file: UploadFile = File(..., description="Document image file"),
     document_type: Literal["pan", "aadhaar"] = Form(..., description="Type of document")
 ):
@@ -172,26 +350,5 @@ async def extract_document(
     
     Returns extracted document details based on document type
     """
-    file_path = None
-    
-    try:
-        # Save uploaded file
-        file_path = await save_upload_file(file)
-        
-        # Extract information
-        result = await extractor.extract_from_image(
-            file_path,
-            document_type=document_type,
-            original_filename=file.filename
-        )
-        
-        return result
-    
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if file_path:
-            cleanup_file(file_path)
+    return await _do_extract(request, file, document_type, background)
 
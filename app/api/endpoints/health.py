@@ -1,21 +1,47 @@
 """
 Health check endpoints
 """
+import asyncio
+import time
 from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
 from datetime import datetime
 
 from app.core.config import settings
 from app.models.response import HealthResponse
 from app.services.extractor import extractor
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Health probes share one Moondream connection check for a short window so
+# frequent liveness/readiness polling doesn't hammer the model server
+_CHECK_TTL_SECONDS = 2.0
+_check_lock = asyncio.Lock()
+_last_check_at = 0.0
+_last_check_result = False
+
+
+async def _moondream_connected() -> bool:
+    """Check Moondream connectivity, reusing a recent result within the TTL"""
+    global _last_check_at, _last_check_result
+
+    if time.monotonic() - _last_check_at < _CHECK_TTL_SECONDS:
+        return _last_check_result
+
+    async with _check_lock:
+        # Re-check inside the lock so concurrent expirations probe only once
+        if time.monotonic() - _last_check_at >= _CHECK_TTL_SECONDS:
+            _last_check_result = await extractor.check_connection()
+            _last_check_at = time.monotonic()
+
+    return _last_check_result
 
 
 @router.get("/", response_model=HealthResponse)
 async def root_health():
     """Root health check endpoint"""
-    moondream_connected = await extractor.check_connection()
-    
+    moondream_connected = await _moondream_connected()
+
     return HealthResponse(
         status="healthy" if moondream_connected else "degraded",
         timestamp=datetime.now(),
@@ -27,8 +53,8 @@ async def root_health():
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
     """Detailed health check endpoint"""
-    moondream_connected = await extractor.check_connection()
-    
+    moondream_connected = await _moondream_connected()
+
     return HealthResponse(
         status="healthy" if moondream_connected else "degraded",
         timestamp=datetime.now(),
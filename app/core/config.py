@@ -3,10 +3,11 @@ Configuration settings for the application
 """
 import os
 import json
+from functools import cached_property
 from pathlib import Path
-from typing import List
+from typing import FrozenSet, List
 from pydantic_settings import BaseSettings
-from pydantic import Field
+from pydantic import Field, field_validator
 
 
 class Settings(BaseSettings):
@@ -27,25 +28,32 @@ class Settings(BaseSettings):
     MOONDREAM_ENDPOINT: str = Field(default="http://localhost:2020/v1")
     MOONDREAM_MODEL: str = Field(default="moondream2")
     MOONDREAM_TIMEOUT: int = Field(default=30)
+    MOONDREAM_MAX_CONCURRENCY: int = Field(default=8)
     
     # File Upload Settings
     UPLOAD_FOLDER: str = Field(default="uploads")
     OUTPUT_FOLDER: str = Field(default="outputs")
     LOGS_FOLDER: str = Field(default="logs")
     MAX_FILE_SIZE: int = Field(default=10485760)  # 10MB
-    ALLOWED_EXTENSIONS: str = Field(default='["jpg", "jpeg", "png", "pdf"]')
+    ALLOWED_EXTENSIONS: List[str] = Field(default=["jpg", "jpeg", "png", "pdf"])
     
     # Processing Settings
+    MAX_IMAGE_DIMENSION: int = Field(default=1280)  # Longest edge sent to Moondream
+    JPEG_QUALITY: int = Field(default=85)
+    BATCH_CONCURRENCY: int = Field(default=8)
+    EXTRACTION_CACHE_ENABLED: bool = Field(default=True)
+    EXTRACTION_CACHE_MAXSIZE: int = Field(default=10000)
+    EXTRACTION_CACHE_TTL: int = Field(default=3600)
     SAVE_EXTRACTED_DATA: bool = Field(default=True)
     DELETE_UPLOADED_FILES: bool = Field(default=False)
     VALIDATE_PAN_FORMAT: bool = Field(default=True)
     VALIDATE_AADHAAR_FORMAT: bool = Field(default=True)
     
     # CORS Settings
-    CORS_ORIGINS: str = Field(default='["http://localhost:3000", "http://localhost:8000"]')
+    CORS_ORIGINS: List[str] = Field(default=["http://localhost:3000", "http://localhost:8000"])
     CORS_ALLOW_CREDENTIALS: bool = Field(default=True)
-    CORS_ALLOW_METHODS: str = Field(default='["*"]')
-    CORS_ALLOW_HEADERS: str = Field(default='["*"]')
+    CORS_ALLOW_METHODS: List[str] = Field(default=["*"])
+    CORS_ALLOW_HEADERS: List[str] = Field(default=["*"])
     
     # Security
     SECRET_KEY: str = Field(default="your-secret-key-change-in-production")
@@ -59,20 +67,33 @@ class Settings(BaseSettings):
     class Config:
         env_file = ".env"
         case_sensitive = True
-    
-    def get_allowed_extensions(self) -> List[str]:
-        """Parse allowed extensions from JSON string"""
-        try:
-            return json.loads(self.ALLOWED_EXTENSIONS)
-        except:
-            return ["jpg", "jpeg", "png", "pdf"]
-    
+
+    @field_validator(
+        "ALLOWED_EXTENSIONS",
+        "CORS_ORIGINS",
+        "CORS_ALLOW_METHODS",
+        "CORS_ALLOW_HEADERS",
+        mode="before"
+    )
+    @classmethod
+    def _parse_json_list(cls, value):
+        """Accept JSON-encoded lists from the environment"""
+        if isinstance(value, str):
+            return json.loads(value)
+        return value
+
+    @cached_property
+    def _allowed_extensions_set(self) -> FrozenSet[str]:
+        """Allowed extensions as a frozenset for O(1) lookup"""
+        return frozenset(self.ALLOWED_EXTENSIONS)
+
+    def get_allowed_extensions(self) -> FrozenSet[str]:
+        """Get allowed extensions as a cached frozenset"""
+        return self._allowed_extensions_set
+
     def get_cors_origins(self) -> List[str]:
-        """Parse CORS origins from JSON string"""
-        try:
-            return json.loads(self.CORS_ORIGINS)
-        except:
-            return ["*"]
+        """Get the configured CORS origins"""
+        return self.CORS_ORIGINS
     
     def ensure_directories(self):
         """Create necessary directories if they don't exist"""
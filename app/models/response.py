@@ -3,7 +3,7 @@ Response models for API endpoints
 """
 from typing import Optional, Dict, Any, List, Literal
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 
 class PANData(BaseModel):
@@ -57,6 +57,11 @@ class BatchExtractionResponse(BaseModel):
     processing_time_ms: Optional[float] = None
 
 
+# Cached adapter so batch responses are serialized once instead of being
+# re-validated through FastAPI's response_model machinery
+BATCH_RESPONSE_ADAPTER: TypeAdapter = TypeAdapter(BatchExtractionResponse)
+
+
 class HealthResponse(BaseModel):
     """Health check response"""
     status: str = Field(..., description="Service status")
@@ -1,6 +1,7 @@
 """
 AI prompts for document extraction
 """
+from functools import lru_cache
 
 PAN_EXTRACTION_PROMPT = """
 Analyze this PAN card image carefully and extract the following information:
@@ -27,7 +28,7 @@ Important:
 - Maintain proper capitalization as shown on the card
 - For PAN number, ensure all characters are captured correctly
 - Date should be in DD/MM/YYYY format
-"""
+""".strip()
 
 AADHAAR_EXTRACTION_PROMPT = """
 Analyze this Aadhaar card image carefully and extract the following information:
@@ -57,23 +58,26 @@ Important:
 - For Aadhaar number, preserve the spacing format (XXXX XXXX XXXX)
 - Include complete address with all details
 - Some Aadhaar cards may have masked digits (XXXX) in the number
-"""
+""".strip()
 
 
+# Prompt lookup table built once at import instead of per call
+_PROMPTS = {
+    "pan": PAN_EXTRACTION_PROMPT,
+    "aadhaar": AADHAAR_EXTRACTION_PROMPT
+}
+
+
+@lru_cache(maxsize=8)
 def get_extraction_prompt(document_type: str) -> str:
     """
     Get the appropriate extraction prompt based on document type
-    
+
     Args:
         document_type: Type of document ("pan" or "aadhaar")
-    
+
     Returns:
         Extraction prompt string
     """
-    prompts = {
-        "pan": PAN_EXTRACTION_PROMPT,
-        "aadhaar": AADHAAR_EXTRACTION_PROMPT
-    }
-    
-    return prompts.get(document_type.lower(), "")
+    return _PROMPTS.get(document_type.lower(), "")
 
@@ -0,0 +1,20 @@
+"""
+Timestamp helpers for response metadata
+"""
+from datetime import datetime, timezone
+
+_UTC = timezone.utc
+
+
+def now_iso() -> str:
+    """
+    Current UTC time as an ISO-8601 string
+
+    A tz-aware UTC datetime skips the localtime/tz lookup that naive
+    datetime.now() pays, and timespec="milliseconds" avoids formatting
+    microseconds nobody reads.
+
+    Returns:
+        ISO-8601 timestamp string with millisecond precision
+    """
+    return datetime.now(_UTC).isoformat(timespec="milliseconds")
@@ -2,29 +2,36 @@
 Main FastAPI application entry point
 PAN & Aadhaar Card Details Extractor using Moondream AI
 """
+import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from datetime import datetime
-
+from fastapi.responses import ORJSONResponse, RedirectResponse
 from app.core.config import settings
+from app.utils.timestamps import now_iso
 from app.api.endpoints import health, extract, batch
+from app.services.extractor import get_moondream_client, close_moondream_client
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan event handler for startup and shutdown"""
     # Startup
+    logging.basicConfig(level=logging.DEBUG if settings.DEBUG else logging.INFO)
     print(f"Starting {settings.PROJECT_NAME} v{settings.VERSION}")
     print(f"Debug mode: {settings.DEBUG}")
     print(f"Moondream endpoint: {settings.MOONDREAM_ENDPOINT}")
     print(f"API documentation: http://{settings.HOST}:{settings.PORT}/docs")
     settings.ensure_directories()
-    
+
+    # Create the shared Moondream HTTP client up front so the first request
+    # doesn't pay for it
+    get_moondream_client()
+
     yield
-    
+
     # Shutdown
     print(f"Shutting down {settings.PROJECT_NAME}")
+    await close_moondream_client()
 
 
 # Create FastAPI application
@@ -35,6 +42,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -48,25 +56,28 @@ app.add_middleware(
 )
 
 
+# Static portion of the root response, built once instead of per request
+_ROOT_BODY = {
+    "name": settings.PROJECT_NAME,
+    "version": settings.VERSION,
+    "status": "running",
+    "docs": "/docs",
+    "health": "/health",
+    "endpoints": {
+        "pan_extraction": f"{settings.API_V1_PREFIX}/extract/pan",
+        "aadhaar_extraction": f"{settings.API_V1_PREFIX}/extract/aadhaar",
+        "generic_extraction": f"{settings.API_V1_PREFIX}/extract",
+        "batch_extraction": f"{settings.API_V1_PREFIX}/batch/extract",
+        "async_batch_extraction": f"{settings.API_V1_PREFIX}/batch/extract/async"
+    }
+}
+
+
 # Root endpoint
 @app.get("/")
 async def root():
     """API information endpoint"""
-    return {
-        "name": settings.PROJECT_NAME,
-        "version": settings.VERSION,
-        "status": "running",
-        "timestamp": datetime.now().isoformat(),
-        "docs": "/docs",
-        "health": "/health",
-        "endpoints": {
-            "pan_extraction": f"{settings.API_V1_PREFIX}/extract/pan",
-            "aadhaar_extraction": f"{settings.API_V1_PREFIX}/extract/aadhaar",
-            "generic_extraction": f"{settings.API_V1_PREFIX}/extract",
-            "batch_extraction": f"{settings.API_V1_PREFIX}/batch/extract",
-            "async_batch_extraction": f"{settings.API_V1_PREFIX}/batch/extract/async"
-        }
-    }
+    return {**_ROOT_BODY, "timestamp": now_iso()}
 
 
 # Include routers
@@ -75,11 +86,12 @@ app.include_router(
     tags=["Health"]
 )
 
-app.include_router(
-    health.router,
-    prefix=settings.API_V1_PREFIX,
-    tags=["Health"]
-)
+
+# Versioned alias kept for compatibility; a redirect avoids registering the
+# whole health router twice
+@app.get(f"{settings.API_V1_PREFIX}/health", include_in_schema=False)
+async def health_alias():
+    return RedirectResponse(url="/health", status_code=308)
 
 app.include_router(
     extract.router,
@@ -97,26 +109,26 @@ app.include_router(
 # Exception handlers
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=404,
         content={
             "status": "error",
             "error": "Endpoint not found",
             "detail": str(exc),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }
     )
 
 
 @app.exception_handler(500)
 async def internal_error_handler(request, exc):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "status": "error",
             "error": "Internal server error",
             "detail": str(exc),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }
     )
 
@@ -0,0 +1,46 @@
+"""
+Shared pytest fixtures
+"""
+import base64
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+# A pre-baked 8x8 white JPEG (Pillow output, generated offline): the tests
+# only need bytes that pass the upload gate, so no JPEG encoder runs at all.
+# bytes is immutable and httpx never mutates upload payloads, so this single
+# object backs every file tuple in the suite without being copied.
+_TINY_JPEG = base64.b64decode(
+    b"/9j/4AAQSkZJRgABAQAAAQABAAD/2wBDAAgGBgcGBQgHBwcJCQgKDBQNDAsLDBkSEw8U"
+    b"HRofHh0aHBwgJC4nICIsIxwcKDcpLDAxNDQ0Hyc5PTgyPC4zNDL/2wBDAQkJCQwLDBgN"
+    b"DRgyIRwhMjIyMjIyMjIyMjIyMjIyMjIyMjIyMjIyMjIyMjIyMjIyMjIyMjIyMjIyMjIy"
+    b"MjIyMjL/wAARCAAIAAgDASIAAhEBAxEB/8QAHwAAAQUBAQEBAQEAAAAAAAAAAAECAwQF"
+    b"BgcICQoL/8QAtRAAAgEDAwIEAwUFBAQAAAF9AQIDAAQRBRIhMUEGE1FhByJxFDKBkaEI"
+    b"I0KxwRVS0fAkM2JyggkKFhcYGRolJicoKSo0NTY3ODk6Q0RFRkdISUpTVFVWV1hZWmNk"
+    b"ZWZnaGlqc3R1dnd4eXqDhIWGh4iJipKTlJWWl5iZmqKjpKWmp6ipqrKztLW2t7i5usLD"
+    b"xMXGx8jJytLT1NXW19jZ2uHi4+Tl5ufo6erx8vP09fb3+Pn6/8QAHwEAAwEBAQEBAQEB"
+    b"AQAAAAAAAAECAwQFBgcICQoL/8QAtREAAgECBAQDBAcFBAQAAQJ3AAECAxEEBSExBhJB"
+    b"UQdhcRMiMoEIFEKRobHBCSMzUvAVYnLRChYkNOEl8RcYGRomJygpKjU2Nzg5OkNERUZH"
+    b"SElKU1RVVldYWVpjZGVmZ2hpanN0dXZ3eHl6goOEhYaHiImKkpOUlZaXmJmaoqOkpaan"
+    b"qKmqsrO0tba3uLm6wsPExcbHyMnK0tPU1dbX2Nna4uPk5ebn6Onq8vP09fb3+Pn6/9oA"
+    b"DAMBAAIRAxEAPwD3+iiigD//2Q=="
+)
+
+
+@pytest.fixture(scope="session")
+def image():
+    """Valid JPEG bytes for upload tests, decoded once per worker"""
+    return _TINY_JPEG
+
+
+
+@pytest.fixture(scope="session")
+def client():
+    """One TestClient for the whole session so app startup/shutdown runs once"""
+    # Imported lazily so test files that never use the client (e.g. the
+    # validator unit tests) don't pay for app construction
+    from main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
@@ -0,0 +1,50 @@
+"""
+Validator unit tests
+
+Kept free of main/FastAPI imports so validator-only runs skip app and
+route construction entirely.
+"""
+from app.services.validator import (
+    validate_pan_format,
+    validate_aadhaar_format,
+    clean_pan_number,
+    clean_aadhaar_number
+)
+
+
+class TestValidation:
+    """Validator unit tests"""
+
+    def test_pan_format_validation(self):
+        assert validate_pan_format("ABCDE1234F")[0] is True
+        assert validate_pan_format("abcde1234f")[0] is True
+        assert validate_pan_format("ABCDE12345")[0] is False
+        assert validate_pan_format("AB1234567F")[0] is False
+        assert validate_pan_format("")[0] is False
+
+    def test_aadhaar_format_validation(self):
+        assert validate_aadhaar_format("1234 5678 9012")[0] is True
+        assert validate_aadhaar_format("123456789012")[0] is True
+        assert validate_aadhaar_format("1234 XXXX 9012")[0] is True
+        assert validate_aadhaar_format("XXXX XXXX XXXX")[0] is False
+        assert validate_aadhaar_format("1234")[0] is False
+        assert validate_aadhaar_format("")[0] is False
+
+    def test_pan_validation_is_ascii_only(self):
+        # The str-method checks must stay as strict as the old [A-Z] regex:
+        # unicode letters and digits pass isalpha/isdigit but not isascii
+        assert validate_pan_format("ÉBCDE1234F")[0] is False
+        assert validate_pan_format("ABCDE123٤F")[0] is False
+
+    def test_aadhaar_validation_charset(self):
+        assert validate_aadhaar_format("12AB 5678 9012")[0] is False
+        assert validate_aadhaar_format("1234 5678 901٤")[0] is False
+
+    def test_clean_pan_number(self):
+        assert clean_pan_number(" abcde1234f ") == "ABCDE1234F"
+        assert clean_pan_number("") == ""
+
+    def test_clean_aadhaar_number(self):
+        assert clean_aadhaar_number("123456789012") == "1234 5678 9012"
+        assert clean_aadhaar_number("1234-5678-9012") == "1234 5678 9012"
+        assert clean_aadhaar_number("") == ""